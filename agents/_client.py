@@ -0,0 +1,19 @@
+import atexit
+
+import httpx
+import litellm
+
+# One connection pool for every sync Groq call, so agents reuse warm TLS sessions.
+# No shared AsyncClient: each search runs on its own event loop, and httpx's async
+# pool can't be reused across loops, so LiteLLM keeps its own per-loop clients
+_limits = httpx.Limits(max_connections=32, max_keepalive_connections=16)
+
+_client = httpx.Client(http2=True, timeout=60, limits=_limits)
+
+def configure_litellm():
+    """Route LiteLLM's sync Groq requests through the shared client"""
+    litellm.client_session = _client
+
+@atexit.register
+def _close_client():
+    _client.close()
@@ -0,0 +1,116 @@
+from crewai import Agent
+from functools import lru_cache
+import os
+import re
+
+from agents._client import configure_litellm
+from utils.llm_cache import CachedLLM
+
+# Share one HTTP/2 connection pool across all agents
+configure_litellm()
+
+# CrewAI's verbose console output is costly, so it's opt-in
+VERBOSE = os.getenv("CREWAI_VERBOSE", "false").lower() == "true"
+
+FAST_MODEL = "groq/llama-3.1-8b-instant"
+STRONG_MODEL = "groq/llama-3.3-70b-versatile"
+
+# Comparisons, budgets and hard specs are what make a query worth the 70B model
+_COMPLEXITY_SIGNALS = re.compile(
+    r'\b(?:vs\.?|versus|compare|comparison|between|or)\b'
+    r'|\$\s?\d'
+    r'|\b\d+\s?(?:gb|tb|hz|mah|w|inch|in)\b'
+    r'|,',
+    re.IGNORECASE
+)
+
+# Everything that differs between the shopping agents
+AGENT_SPECS = {
+    "research": {
+        "role": "Product Research Specialist",
+        "goal": "Find and gather comprehensive product information based on user queries",
+        "backstory": """You are an expert product researcher with deep knowledge of e-commerce
+        and consumer goods. You excel at finding relevant products and extracting key
+        information like pricing, ratings, and specifications from search results.""",
+        # Searching and extracting JSON is simple enough for the 8B model
+        "llm": FAST_MODEL,
+        # One search plus one Submit Results call; the tool's schema removes
+        # the "re-ask because the JSON broke" round
+        "max_iter": 2
+    },
+    "enrichment": {
+        "role": "Product Data Specialist",
+        "goal": "Repair and complete product research results that are missing or malformed",
+        "backstory": """You are a senior e-commerce data specialist who steps in when product
+        research comes back incomplete. You re-run searches when needed and turn messy
+        findings into complete, well-structured product data.""",
+        # Only runs when the 8B research output fails validation
+        "llm": STRONG_MODEL,
+        "max_iter": 2
+    },
+    "analysis": {
+        "role": "Product Analysis Expert",
+        "goal": "Analyze and compare products based on price, features, ratings, and value",
+        "backstory": """You are a meticulous analyst who excels at comparing products
+        objectively. You can quickly identify the best value propositions, highlight
+        pros and cons, and rank products based on various criteria like price-to-performance
+        ratio, user ratings, and feature completeness.""",
+        "llm": FAST_MODEL,
+        "max_iter": 2
+    },
+    "recommendation": {
+        "role": "Personal Shopping Advisor",
+        "goal": "Provide personalized product recommendations with clear reasoning",
+        "backstory": """You are a friendly and knowledgeable shopping advisor who understands
+        consumer needs and preferences. You excel at translating technical product
+        comparisons into easy-to-understand recommendations that match user requirements
+        and budget constraints.""",
+        "llm": STRONG_MODEL,
+        "max_iter": 2
+    },
+    "purchase": {
+        "role": "Purchase Decision Assistant",
+        "goal": "Highlight the best purchase option and provide clear buying guidance",
+        "backstory": """You are a decisive purchase assistant who helps users make final
+        buying decisions. You excel at identifying the single best option from a list
+        of recommendations and providing clear, actionable next steps for purchase.""",
+        "llm": FAST_MODEL,
+        "max_iter": 1
+    }
+}
+
+@lru_cache(maxsize=None)
+def _get_llm(model):
+    """Return the LLM shared by every agent that runs on this model"""
+    return CachedLLM(model=model)
+
+def route(query):
+    """Pick a model per agent from how demanding the query looks
+
+    Simple queries keep every step on the 8B model; ones with several
+    constraints move analysis up to 70B. Research stays on 8B either way,
+    since the 70B enrichment step already covers its failures.
+    """
+    signals = len(_COMPLEXITY_SIGNALS.findall(query)) + (len(query.split()) > 8)
+
+    models = {name: spec["llm"] for name, spec in AGENT_SPECS.items()}
+    if signals >= 2:
+        models["analysis"] = STRONG_MODEL
+    else:
+        models["recommendation"] = FAST_MODEL
+    return models
+
+def make_agent(name, tools=None, model=None):
+    """Create one of the shopping agents described in AGENT_SPECS"""
+    spec = AGENT_SPECS[name]
+
+    return Agent(
+        role=spec["role"],
+        goal=spec["goal"],
+        backstory=spec["backstory"],
+        verbose=VERBOSE,
+        allow_delegation=False,
+        tools=tools or [],
+        llm=_get_llm(model or spec["llm"]),
+        max_iter=spec["max_iter"]
+    )
@@ -0,0 +1,98 @@
+import json
+from typing import List, Optional, Union
+
+from pydantic import BaseModel, ConfigDict, Field, ValidationError
+
+from utils.helpers import extract_json_obj
+
+class Product(BaseModel):
+    """A single product found by the research agent"""
+    model_config = ConfigDict(extra="allow")
+
+    title: str
+    price: Optional[Union[str, float]] = None
+    rating: Optional[Union[str, float]] = None
+    image_url: Optional[str] = ""
+    buy_url: Optional[str] = ""
+    description: Optional[str] = ""
+
+class ResearchOutput(BaseModel):
+    """Structured result of the research task"""
+    model_config = ConfigDict(extra="allow")
+
+    products: List[Product]
+
+class RankedProduct(BaseModel):
+    """A product with its place in the analysis ranking"""
+    model_config = ConfigDict(extra="allow")
+
+    rank: Optional[int] = None
+    title: str
+    reasoning: Optional[str] = ""
+
+class AnalysisOutput(BaseModel):
+    """Structured result of the analysis task"""
+    model_config = ConfigDict(extra="allow")
+
+    ranked_products: List[RankedProduct]
+
+class Recommendation(BaseModel):
+    """One personalized recommendation"""
+    model_config = ConfigDict(extra="allow")
+
+    title: str
+    reasoning: Optional[str] = ""
+    price: Optional[Union[str, float]] = None
+
+class RecommendationOutput(BaseModel):
+    """Structured result of the recommendation task"""
+    model_config = ConfigDict(extra="allow")
+
+    recommendations: List[Recommendation]
+
+class PurchaseOption(BaseModel):
+    """The product the purchase agent settled on"""
+    model_config = ConfigDict(extra="allow")
+
+    title: str
+    price: Optional[Union[str, float]] = None
+    rating: Optional[Union[str, float]] = None
+    image_url: Optional[str] = ""
+    purchase_url: Optional[str] = ""
+
+class BestChoiceReason(BaseModel):
+    model_config = ConfigDict(extra="allow")
+
+    reasoning: Optional[str] = ""
+
+class NextSteps(BaseModel):
+    model_config = ConfigDict(extra="allow")
+
+    recommended_action: Optional[str] = ""
+    considerations: Optional[Union[str, List[str]]] = ""
+
+class PurchaseOutput(BaseModel):
+    """Structured result of the purchase task, keyed the way the UI reads it"""
+    model_config = ConfigDict(extra="allow", populate_by_name=True)
+
+    best_purchase_option: PurchaseOption
+    why_best: BestChoiceReason = Field(default_factory=BestChoiceReason, alias="why_it's_the_best_choice")
+    next_steps_for_purchase: NextSteps = Field(default_factory=NextSteps)
+
+def parse_research_output(raw):
+    """Validate raw research output, returning None if it doesn't fit the schema"""
+    json_str = extract_json_obj(raw or '')
+    if not json_str:
+        return None
+
+    try:
+        research = ResearchOutput.model_validate(json.loads(json_str))
+    except (json.JSONDecodeError, ValidationError):
+        return None
+
+    return research if research.products else None
+
+def needs_enrichment(task_output):
+    """True when the research task produced no usable products"""
+    research = getattr(task_output, "pydantic", None) or parse_research_output(task_output.raw)
+    return research is None or not research.products
@@ -10,21 +10,21 @@ import os
 os.environ["CREWAI_DISABLE_MEMORY"] = "true"
 
 import streamlit as st
+from streamlit.errors import StreamlitAPIException
 from dotenv import load_dotenv
-from crewai import Crew, Task
-import json
+import orjson
 import asyncio
+import threading
 
 # Load environment variables
 load_dotenv()
 
-# Import our custom modules
-from tools.rapidapi_tool import RapidAPIShoppingTool
-from agents.research_agent import create_research_agent
-from agents.analysis_agent import create_analysis_agent  
-from agents.recommendation_agent import create_recommendation_agent
-from agents.purchase_agent import create_purchase_agent
-from utils.helpers import clean_json_response, format_product_card, validate_url, create_search_fallback_url
+# Import our custom modules (CrewAI and the agents are imported lazily so
+# the page renders before they finish loading)
+from utils.helpers import canonicalize_product, clean_json_response, clean_json_responses, validate_url, create_search_fallback_url
+from utils.ui import render_product_list
+from utils.batching import chunk_queries, marshal_queries, unmarshal_results
+from utils.ranking import top_pick
 
 # Page configuration
 st.set_page_config(
@@ -35,7 +35,7 @@ st.set_page_config(
 )
 
 # Custom CSS
-st.markdown("""
+_CSS = """
 <style>
 .main-header {
     text-align: center;
@@ -51,108 +51,318 @@ st.markdown("""
 .completed { background-color: #d4edda; border-left: 5px solid #28a745; }
 .error { background-color: #f8d7da; border-left: 5px solid #dc3545; }
 </style>
-""", unsafe_allow_html=True)
+"""
 
-def initialize_crew():
-    """Initialize the CrewAI system with all agents"""
-    if not os.getenv("GROQ_API_KEY"):
-        st.error("🔑 Please set your GROQ_API_KEY in the .env file")
-        return None, None
+@st.cache_resource
+def _inject_css():
+    """Inject the custom CSS (replayed from cache on reruns)"""
+    st.markdown(_CSS, unsafe_allow_html=True)
+
+# Example queries shown in the sidebar
+EXAMPLE_QUERIES = [
+    "wireless headphones under $200",
+    "ergonomic office chair",
+    "gaming laptop RTX 4060",
+    "smartphone with good camera",
+    "running shoes for beginners"
+]
+
+# API keys, read once after load_dotenv()
+GROQ_API_KEY = os.getenv("GROQ_API_KEY")
+RAPIDAPI_KEY = os.getenv("RAPIDAPI_KEY")
+
+# Stay just under Groq's free tier limit of 30 requests per minute
+GROQ_MAX_RPM = int(os.getenv("GROQ_MAX_RPM", "25"))
+
+# Run the example queries in the background so clicking one is instant
+PREWARM_EXAMPLES = os.getenv("PREWARM_EXAMPLES", "false").lower() == "true"
+PREWARM_CONCURRENCY = int(os.getenv("PREWARM_CONCURRENCY", "2"))
+
+# The search flow shows its own progress bar, so skip Streamlit's spinner
+@st.cache_resource(show_spinner=False)
+def initialize_crew(groq_api_key, models=None):
+    """Initialize the CrewAI system with all agents
+    
+    The agents are built once per process and shared by every session, so
+    each run works on its own agent.copy(). Keying on the API key rebuilds
+    them if the key changes, and each distinct routing from
+    agents.factory.route gets its own set.
+    """
+    from agents.factory import make_agent
+    from tools.rapidapi_tool import RapidAPIShoppingTool
+    from tools.submit_results_tool import SubmitResultsTool
     
-    # Initialize tool
+    # Initialize tools
     rapidapi_tool = RapidAPIShoppingTool()
+    submit_tool = SubmitResultsTool()
     
-    # Create agents
-    research_agent = create_research_agent(rapidapi_tool)
-    analysis_agent = create_analysis_agent()
-    recommendation_agent = create_recommendation_agent()
-    purchase_agent = create_purchase_agent()
+    # Create agents, on the routed models when given
+    models = models or {}
+    research_agent = make_agent("research", tools=[rapidapi_tool, submit_tool], model=models.get("research"))
+    enrichment_agent = make_agent("enrichment", tools=[rapidapi_tool, submit_tool], model=models.get("enrichment"))
+    analysis_agent = make_agent("analysis", model=models.get("analysis"))
+    recommendation_agent = make_agent("recommendation", model=models.get("recommendation"))
+    purchase_agent = make_agent("purchase", model=models.get("purchase"))
     
-    agents = [research_agent, analysis_agent, recommendation_agent, purchase_agent]
+    agents = [research_agent, enrichment_agent, analysis_agent, recommendation_agent, purchase_agent]
     
     return agents, rapidapi_tool
 
+@st.cache_resource(show_spinner=False)
+def prewarm_examples(groq_api_key):
+    """Run the example queries in the background and cache the results
+    
+    Each query gets its own research pipeline, but the queries are batched
+    so analysis, recommendation and purchase take one prompt per batch
+    instead of one per query. Cached as a resource so the examples are only
+    warmed once per process.
+    """
+    from agents.factory import route
+    from utils.llm_cache import llm_cache
+    from utils.pipeline import run_pipeline_async
+    
+    # Same model routing as a live search, so the cached runs match
+    crews = {query: initialize_crew(groq_api_key, route(query)) for query in EXAMPLE_QUERIES}
+    routed_agents = {query: agents for query, (agents, _) in crews.items()}
+    rapidapi_tool = crews[EXAMPLE_QUERIES[0]][1]
+    
+    async def warm(batch, semaphore):
+        # Every query's tasks get their own agent copies so the concurrent
+        # searches don't share executors
+        agent_sets = [[agent.copy() for agent in routed_agents[query]] for query in batch]
+        
+        async with semaphore:
+            output = await run_pipeline_async(create_batch_tasks(agent_sets, batch), max_rpm=GROQ_MAX_RPM)
+        outputs = [task_output.raw for task_output in output["tasks_output"]]
+        
+        # Research and enrichment pairs, then the three batched answers
+        research_outputs = outputs[:-3]
+        analyses, recommendations, purchases = (
+            unmarshal_results(payload, len(batch)) for payload in clean_json_responses(outputs[-3:])
+        )
+        
+        for i, query in enumerate(batch):
+            # Empty answers are stored as "" so a full search doesn't reuse them
+            downstream = [
+                orjson.dumps(result).decode() if result else ""
+                for result in (analyses[i], recommendations[i], purchases[i])
+            ]
+            llm_cache.store_result(query, research_outputs[2 * i:2 * i + 2] + downstream)
+    
+    async def run():
+        # Only a few batches at a time so the burst doesn't trigger 429s
+        semaphore = asyncio.Semaphore(PREWARM_CONCURRENCY)
+        await asyncio.gather(*(warm(batch, semaphore) for batch in chunk_queries(EXAMPLE_QUERIES)), return_exceptions=True)
+    
+    def warm_all():
+        # Search every example at once first, so the research agents' tool calls
+        # (for exactly these queries) hit the tool's search cache
+        rapidapi_tool._run_batch(EXAMPLE_QUERIES)
+        asyncio.run(run())
+    
+    thread = threading.Thread(target=warm_all, daemon=True)
+    thread.start()
+    return thread
+
 def create_tasks(agents, user_query):
     """Create tasks for each agent"""
-    research_agent, analysis_agent, recommendation_agent, purchase_agent = agents
+    from crewai import Task
+    from crewai.tasks.conditional_task import ConditionalTask
+    from agents.schemas import (
+        AnalysisOutput,
+        PurchaseOutput,
+        RecommendationOutput,
+        ResearchOutput,
+        needs_enrichment
+    )
+    
+    research_agent, enrichment_agent, analysis_agent, recommendation_agent, purchase_agent = agents
     
     # Task 1: Research products
     research_task = Task(
-        description=f"""
-        Search for products related to: "{user_query}"
-        
-        Use the Product Search Tool to find relevant products.
-        Extract and structure the following information for each product:
-        - Title
-        - Price  
-        - Rating
-        - Image URL
-        - Purchase URL
-        - Brief description
-        
-        Return the results in JSON format with a 'products' array.
-        """,
+        description=(
+            f'Find products for: "{user_query}". Use the Product Search Tool with exactly that query, then call '
+            "Submit Results with every product (title, price, rating, image_url, buy_url, description)."
+        ),
         agent=research_agent,
-        expected_output="JSON with products array containing product details"
+        expected_output="Submitted products",
+        output_pydantic=ResearchOutput
     )
     
+    # Task 1b: Retry on the 70B model only if the 8B research output is unusable
+    enrichment_task = ConditionalTask(
+        description=(
+            f'Research for "{user_query}" came back incomplete. Search again if needed, '
+            "then call Submit Results with complete products."
+        ),
+        agent=enrichment_agent,
+        expected_output="Submitted products",
+        output_pydantic=ResearchOutput,
+        condition=needs_enrichment
+    )
+    
+    # Tasks 2 and 3 only need the research output, so run_pipeline_async overlaps them
     # Task 2: Analyze products
     analysis_task = Task(
-        description=f"""
-        Analyze the products found by the research agent for the query: "{user_query}"
-        
-        Compare products based on:
-        - Price-to-value ratio
-        - User ratings and reviews
-        - Feature completeness
-        - Brand reputation (if applicable)
-        
-        Rank the products from best to worst and provide reasoning.
-        Return analysis in JSON format with ranked products and explanations.
-        """,
+        description=(
+            f'Rank the researched products for "{user_query}" by value for money, ratings, '
+            'features and brand. JSON only: {"ranked_products": [{"rank", "title", "reasoning"}]}'
+        ),
         agent=analysis_agent,
-        expected_output="JSON with ranked products and analysis reasoning"
+        expected_output="Ranked products JSON",
+        output_pydantic=AnalysisOutput,
+        context=[research_task, enrichment_task]
     )
     
     # Task 3: Generate recommendations
     recommendation_task = Task(
-        description=f"""
-        Based on the analysis, provide personalized recommendations for: "{user_query}"
-        
-        Consider:
-        - User's likely budget and needs
-        - Best value options
-        - Premium vs budget choices
-        - Specific use cases
-        
-        Provide 2-3 top recommendations with clear explanations.
-        Return in JSON format with recommendations and reasoning.
-        """,
+        description=(
+            f'Recommend the 2-3 best researched products for "{user_query}", weighing likely budget, '
+            'value, premium vs budget and use case. JSON only: {"recommendations": [{"title", "reasoning", "price"}]}'
+        ),
         agent=recommendation_agent,
-        expected_output="JSON with top recommendations and explanations"
+        expected_output="Recommendations JSON",
+        output_pydantic=RecommendationOutput,
+        context=[research_task, enrichment_task]
     )
     
-    # Task 4: Purchase assistance
+    # Task 4: Purchase assistance (waits for both the analysis and recommendations;
+    # the research output carries the real buy_url and image_url)
     purchase_task = Task(
-        description=f"""
-        From the recommendations, identify the single BEST purchase option for: "{user_query}"
-        
-        Highlight:
-        - The #1 recommended product
-        - Why it's the best choice
-        - Next steps for purchase
-        - Any important considerations
-        
-        Return in JSON format with the final recommendation and purchase guidance.
-        """,
+        description=(
+            f'Pick the single best product for "{user_query}" from the analysis and recommendations, '
+            'copying its price, rating, image_url and buy_url (as purchase_url) from the research. '
+            'JSON only: {"best_purchase_option": {"title", "price", "rating", "image_url", "purchase_url"}, '
+            '"why_it\'s_the_best_choice": {"reasoning"}, '
+            '"next_steps_for_purchase": {"recommended_action", "considerations"}}'
+        ),
+        agent=purchase_agent,
+        expected_output="Purchase decision JSON",
+        output_pydantic=PurchaseOutput,
+        context=[research_task, enrichment_task, analysis_task, recommendation_task]
+    )
+    
+    return [research_task, enrichment_task, analysis_task, recommendation_task, purchase_task]
+
+# Parsing is pure over the raw text, so reruns reuse the result
+@st.cache_data(ttl=600, show_spinner=False)
+def parse_json_response(raw):
+    """Cached clean_json_response for raw agent output strings"""
+    return clean_json_response(raw)
+
+def task_payload(task_output):
+    """Return a task's output as a dict, preferring its validated pydantic model"""
+    pydantic_output = getattr(task_output, 'pydantic', None)
+    if pydantic_output is not None:
+        return pydantic_output.model_dump(by_alias=True)
+    
+    if hasattr(task_output, 'raw'):
+        raw = task_output.raw
+    elif isinstance(task_output, dict):
+        raw = task_output.get('raw', str(task_output))
+    else:
+        raw = str(task_output)
+    
+    return parse_json_response(raw)
+
+def research_is_rankable(task_output):
+    """True when a research output has enough priced, rated products to rank locally"""
+    products = getattr(getattr(task_output, 'pydantic', None), 'products', None)
+    return bool(products) and top_pick([product.model_dump() for product in products]) is not None
+
+def local_recommendation(products):
+    """Purchase-task-shaped pick made without the downstream agents"""
+    best = top_pick(products)
+    if best is None:
+        return None
+    
+    return {
+        "best_purchase_option": {**best, "purchase_url": best['buy_url']},
+        "why_it's_the_best_choice": {
+            "reasoning": "Best combination of rating and price among the products found."
+        }
+    }
+
+# Purchase option keys and the researched product fields they come from
+_RESEARCH_FIELDS = {'price': 'price', 'rating': 'rating', 'image_url': 'image_url', 'purchase_url': 'buy_url'}
+
+def ground_purchase_option(best, products):
+    """Fill the pick's price, rating, image and link from the researched product with its title"""
+    title = str(best.get('title', '')).strip().lower()
+    match = next((p for p in products if str(p['title']).strip().lower() == title), None)
+    if match is None:
+        return best
+    
+    # Only take real values, not canonicalize_product's 'N/A' / '' defaults
+    research = {key: match[field] for key, field in _RESEARCH_FIELDS.items() if match[field] not in ('', 'N/A')}
+    return {**best, **research}
+
+def create_batch_tasks(agent_sets, user_queries):
+    """Create tasks that answer several queries with one LLM call per downstream agent
+    
+    agent_sets holds one set of agents per query, so every research task
+    runs on its own copies.
+    """
+    from crewai import Task
+    
+    # Every query still needs its own product search (and enrichment retry)
+    research_tasks = []
+    for agents, query in zip(agent_sets, user_queries):
+        research_task, enrichment_task = create_tasks(agents, query)[:2]
+        # Explicit contexts so run_pipeline_async starts every search at once
+        research_task.context = []
+        enrichment_task.context = [research_task]
+        research_tasks += [research_task, enrichment_task]
+    
+    # The downstream agents handle all queries in a single prompt each
+    _, _, analysis_agent, recommendation_agent, purchase_agent = agent_sets[0]
+    
+    analysis_task = Task(
+        description=marshal_queries(
+            user_queries,
+            'Rank the products found for each of the following queries by value, ratings and features, as '
+            '{"query", "ranked_products": [{"rank", "title", "reasoning"}]}'
+        ),
+        agent=analysis_agent,
+        expected_output=f"JSON results for {len(user_queries)} queries",
+        context=research_tasks
+    )
+    
+    recommendation_task = Task(
+        description=marshal_queries(
+            user_queries,
+            'Recommend the 2-3 best products for each of the following queries, as '
+            '{"query", "recommendations": [{"title", "reasoning", "price"}]}'
+        ),
+        agent=recommendation_agent,
+        expected_output=f"JSON results for {len(user_queries)} queries",
+        context=research_tasks
+    )
+    
+    purchase_task = Task(
+        description=marshal_queries(
+            user_queries,
+            'Pick the single best product for each of the following queries, copying its price, rating, '
+            'image_url and buy_url (as purchase_url) from the research, as '
+            '{"query", "best_purchase_option": {"title", "price", "rating", "image_url", "purchase_url"}, '
+            '"why_it\'s_the_best_choice": {"reasoning"}, '
+            '"next_steps_for_purchase": {"recommended_action", "considerations"}}'
+        ),
         agent=purchase_agent,
-        expected_output="JSON with final purchase recommendation and guidance"
+        expected_output=f"JSON results for {len(user_queries)} queries",
+        context=research_tasks + [analysis_task, recommendation_task]
     )
     
-    return [research_task, analysis_task, recommendation_task, purchase_task]
+    return research_tasks + [analysis_task, recommendation_task, purchase_task]
+
+def _pick_example():
+    """Turn a pill selection into a one-off search, like a button click"""
+    st.session_state["picked_example"] = st.session_state["example_pick"]
+    st.session_state["example_pick"] = None
 
 def main():
     """Main Streamlit application"""
+    _inject_css()
     
     # Header
     st.markdown("<h1 class='main-header'>🛒 AI Shopping Assistant</h1>", unsafe_allow_html=True)
@@ -164,17 +374,36 @@ def main():
         agent_status = st.empty()
         
         st.header("⚙️ Configuration")
-        groq_status = "✅ Connected" if os.getenv("GROQ_API_KEY") else "❌ Missing API Key"
-        rapidapi_status = "✅ Connected" if os.getenv("RAPIDAPI_KEY") else "❌ Missing API Key"
+        groq_status = "✅ Connected" if GROQ_API_KEY else "❌ Missing API Key"
+        rapidapi_status = "✅ Connected" if RAPIDAPI_KEY else "❌ Missing API Key"
         
         st.write(f"**Groq API:** {groq_status}")
         st.write(f"**RapidAPI:** {rapidapi_status}")
+        # Only read the cache module once a search has loaded it,
+        # so the sidebar doesn't pull in CrewAI on first paint
+        cache_module = sys.modules.get("utils.llm_cache")
+        
+        # The concurrency cap lives with the Groq client in utils.llm_cache
+        groq_limits = f"{GROQ_MAX_RPM} req/min"
+        if cache_module:
+            groq_limits += f", {cache_module.GROQ_MAX_CONCURRENCY} concurrent"
+        st.write(f"**Groq limits:** {groq_limits}")
+        
+        prewarm = st.toggle(
+            "Prewarm example queries",
+            value=PREWARM_EXAMPLES,
+            help="Run the example queries in the background so clicking one is instant"
+        )
         
         st.header("📊 System Info")
-        st.write("**Research Agent:** LLaMA 3.3 70B")
-        st.write("**Analysis Agent:** LLaMA 3.1 8B") 
-        st.write("**Recommendation Agent:** LLaMA 3.3 70B")
+        st.write("**Research Agent:** LLaMA 3.1 8B (70B fallback)")
+        st.write("**Analysis Agent:** LLaMA 3.1 8B (70B for complex queries)") 
+        st.write("**Recommendation Agent:** LLaMA 3.3 70B (8B for simple queries)")
         st.write("**Purchase Agent:** LLaMA 3.1 8B")
+        
+        if cache_module:
+            stats = cache_module.llm_cache.stats()
+            st.write(f"**LLM Cache:** {stats['hits']} hits / {stats['misses']} misses ({stats['entries']} entries)")
     
     # Main interface
     col1, col2 = st.columns([2, 1])
@@ -188,30 +417,53 @@ def main():
         )
         
         search_button = st.button("🚀 Search Products", type="primary")
+        fast_mode = st.checkbox(
+            "Fast mode",
+            value=True,
+            help="Pick the top product locally when the search results already have prices and ratings"
+        )
     
     with col2:
         st.subheader("💡 Example Queries")
-        example_queries = [
-            "wireless headphones under $200",
-            "ergonomic office chair",
-            "gaming laptop RTX 4060",
-            "smartphone with good camera",
-            "running shoes for beginners"
-        ]
+        # One widget for all examples instead of a button per query
+        st.pills(
+            "Example queries",
+            EXAMPLE_QUERIES,
+            selection_mode="single",
+            format_func=lambda query: f"🔍 {query}",
+            key="example_pick",
+            on_change=_pick_example,
+            label_visibility="collapsed"
+        )
         
-        for query in example_queries:
-            if st.button(f"🔍 {query}", key=query):
-                user_query = query
-                search_button = True
+        picked = st.session_state.pop("picked_example", None)
+        if picked:
+            user_query = picked
+            search_button = True
+    
+    # Start pre-warming the examples as soon as the page loads
+    if prewarm and GROQ_API_KEY:
+        prewarm_examples(GROQ_API_KEY)
+    
+    # Finished searches are kept per session, so reruns (widget clicks)
+    # re-render them instead of kicking off the agents again
+    results = st.session_state.setdefault("results", {})
+    result_key = (user_query, fast_mode)
     
     # Process search
-    if search_button and user_query:
-        # Initialize crew
-        agents, rapidapi_tool = initialize_crew()
+    if user_query and (search_button or result_key in results):
+        from agents.factory import route
+        from utils.llm_cache import llm_cache, query_scope
+        from utils.streaming import stream_pipeline
         
-        if not agents:
+        # Initialize crew
+        if not GROQ_API_KEY:
+            st.error("🔑 Please set your GROQ_API_KEY in the .env file")
             st.stop()
         
+        # Simple queries run entirely on the 8B model
+        agents, rapidapi_tool = initialize_crew(GROQ_API_KEY, route(user_query))
+        
         # Create progress tracking
         progress_bar = st.progress(0)
         status_text = st.empty()
@@ -222,30 +474,64 @@ def main():
             progress_bar.progress(10)
             
             # Validate API keys first
-            if not os.getenv("GROQ_API_KEY"):
+            if not GROQ_API_KEY:
                 st.error("❌ GROQ_API_KEY is required. Please add it to your .env file.")
                 st.stop()
             
-            if not os.getenv("RAPIDAPI_KEY"):
+            if not RAPIDAPI_KEY:
                 st.error("❌ RAPIDAPI_KEY is required for real product search. Please add it to your .env file.")
                 st.stop()
             
-            # Create tasks
-            tasks = create_tasks(agents, user_query)
-            
-            # Create and run crew
-            crew = Crew(
-                agents=agents,
-                tasks=tasks,
-                verbose=True,
-                process="sequential"
-            )
-            
             status_text.text("🧠 AI agents are working...")
             progress_bar.progress(30)
             
-            # Execute the crew
-            result = crew.kickoff()
+            # Reuse this session's run, then a cached run of this (or a near-identical) query
+            cached_outputs = None if result_key in results else llm_cache.get_result(user_query)
+            
+            if result_key in results:
+                result = results[result_key]
+            # A fast-mode run has no purchase output, so don't reuse it for a full run
+            elif cached_outputs and (fast_mode or cached_outputs[-1]):
+                result = {"tasks_output": cached_outputs}
+            else:
+                # The research agent almost always searches for the query as typed,
+                # so start that request now, while its LLM is still planning
+                rapidapi_tool.prefetch(user_query)
+                
+                # Create tasks on this run's own agent copies; the cached agents are shared
+                # by every session, and concurrent runs would race on their executors
+                tasks = create_tasks([agent.copy() for agent in agents], user_query)
+                
+                # Run the task DAG (research -> {analysis, recommendation} -> purchase).
+                # Upstream outputs are only read by code, so just the purchase
+                # agent's answer is streamed to the user as it's written
+                st.subheader("🧠 Agent Activity")
+                purchase_role = tasks[-1].agent.role
+                stop_when = research_is_rankable if fast_mode else None
+                run = {"result": None, "tasks_done": 0}
+                
+                def purchase_tokens():
+                    for kind, *payload in stream_pipeline(tasks, max_rpm=GROQ_MAX_RPM, stop_when=stop_when):
+                        if kind == "result":
+                            run["result"] = payload[0]
+                        
+                        # Advance the progress bar as each task actually finishes
+                        elif kind == "task":
+                            run["tasks_done"] += 1
+                            done = run["tasks_done"]
+                            progress_bar.progress(30 + 70 * min(done, len(tasks)) // len(tasks))
+                            status_text.text(f"✅ {payload[0].agent} finished ({done}/{len(tasks)})")
+                        
+                        elif payload[0] == purchase_role:
+                            yield payload[1]
+                
+                with query_scope(user_query):
+                    st.write_stream(purchase_tokens())
+                result = run["result"]
+                
+                llm_cache.store_result(user_query, [task_output.raw for task_output in result["tasks_output"]])
+            
+            results[result_key] = result
             
             progress_bar.progress(100)
             status_text.text("✅ Search completed!")
@@ -262,38 +548,34 @@ def main():
                 elif isinstance(result, dict) and 'tasks_output' in result:
                     all_outputs = result['tasks_output']
                 
-                # Extract products from research task (first task output)
+                # Extract products from research task (first task output, or the
+                # 70B enrichment output right after it when that fallback ran)
                 products_data = None
                 if all_outputs and len(all_outputs) > 0:
                     research_output = all_outputs[0]
-                    if hasattr(research_output, 'raw'):
-                        research_raw = research_output.raw
-                    elif isinstance(research_output, dict):
-                        research_raw = research_output.get('raw', str(research_output))
-                    else:
-                        research_raw = str(research_output)
+                    if len(all_outputs) >= 5 and getattr(all_outputs[1], 'raw', all_outputs[1]):
+                        research_output = all_outputs[1]
                     
-                    products_data = clean_json_response(research_raw)
+                    products_data = task_payload(research_output)
                 
                 # Fallback: try to parse the main result
                 if not products_data or not products_data.get('products'):
                     if isinstance(result, str):
-                        products_data = clean_json_response(result)
+                        products_data = parse_json_response(result)
                     elif hasattr(result, 'raw'):
-                        products_data = clean_json_response(result.raw)
+                        products_data = parse_json_response(result.raw)
                     else:
                         products_data = result if isinstance(result, dict) else {}
                 
                 # Display all products
+                products = []
                 if products_data and products_data.get('products'):
                     st.subheader("🛍️ All Products Found")
                     
-                    products = products_data['products']
-                    for idx, product in enumerate(products):
-                        with st.container():
-                            st.markdown(f"### #{idx + 1} - {product.get('title', product.get('Title', 'Unknown Product'))}")
-                            format_product_card(product)
-                            st.divider()
+                    # Normalize keys once so rendering can index fields directly
+                    products = [canonicalize_product(p) for p in products_data['products']]
+                    
+                    render_product_list(products)
                     
                     # Display source info
                     if products_data.get('source'):
@@ -303,22 +585,19 @@ def main():
                 
                 # Display AI recommendation from final task
                 final_recommendation = None
-                if all_outputs and len(all_outputs) >= 4:
-                    final_output = all_outputs[3]  # Purchase agent output
-                    if hasattr(final_output, 'raw'):
-                        final_raw = final_output.raw
-                    elif isinstance(final_output, dict):
-                        final_raw = final_output.get('raw', str(final_output))
-                    else:
-                        final_raw = str(final_output)
-                    
-                    final_recommendation = clean_json_response(final_raw)
+                if all_outputs and len(all_outputs) >= 4 and getattr(all_outputs[-1], 'raw', all_outputs[-1]):
+                    final_recommendation = task_payload(all_outputs[-1])  # Purchase agent output
+                
+                # Fast mode skipped the downstream agents, so rank the products here
+                if fast_mode and not (final_recommendation and final_recommendation.get('best_purchase_option')):
+                    final_recommendation = local_recommendation(products)
                 
                 # Display the AI's top recommendation
                 if final_recommendation and final_recommendation.get('best_purchase_option'):
                     st.subheader("🎯 AI's Top Recommendation")
                     
-                    best_product = final_recommendation['best_purchase_option']
+                    # The agent only sees the research as text, so take its links from the products themselves
+                    best_product = ground_purchase_option(final_recommendation['best_purchase_option'], products)
                     why_best = final_recommendation.get("why_it's_the_best_choice", {})
                     
                     # Display the recommended product
@@ -329,17 +608,19 @@ def main():
                     
                     with col1:
                         img_url = best_product.get('image_url', '')
-                        if img_url and img_url.strip():
+                        if isinstance(img_url, str) and img_url.strip():
                             try:
                                 st.image(img_url, width=200)
-                            except:
+                            except (StreamlitAPIException, TypeError, ValueError):
                                 st.markdown("🖼️ *Image not available*")
                         else:
                             st.markdown("🖼️ *No image available*")
                     
                     with col2:
-                        st.markdown(f"**💰 Price:** {best_product.get('price', 'N/A')}")
-                        st.markdown(f"**⭐ Rating:** {best_product.get('rating', 'N/A')}")
+                        st.markdown(
+                            f"**💰 Price:** {best_product.get('price', 'N/A')}\n\n"
+                            f"**⭐ Rating:** {best_product.get('rating', 'N/A')}"
+                        )
                         
                         if why_best.get('reasoning'):
                             st.success(f"**Why it's the best:** {why_best['reasoning']}")
@@ -370,7 +651,8 @@ def main():
                 st.error(f"Error parsing results: {str(e)}")
                 st.subheader("🔍 Raw Results")
                 st.write("Here's what the AI agents returned:")
-                st.code(str(result), language="json")
+                raw_outputs = [getattr(output, 'raw', output) for output in all_outputs] or [str(result)]
+                st.code(orjson.dumps(raw_outputs, option=orjson.OPT_INDENT_2).decode(), language="json")
                 
         except Exception as e:
             st.error(f"❌ Error during search: {str(e)}")
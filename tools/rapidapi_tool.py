@@ -1,7 +1,13 @@
-import requests
+import asyncio
+import httpx
+import logging
 import os
-import json
+import orjson
 import re
+import threading
+import time
+from collections import OrderedDict
+from urllib.parse import quote_plus
 
 # Fixed import for newer CrewAI versions
 try:
@@ -14,256 +20,439 @@ except ImportError:
 
 from typing import Any
 
+from utils.helpers import extract_product_id_from_url
+
+# Optional incremental JSON parser, so we can stop reading after the first items
+try:
+    import ijson
+except ImportError:
+    ijson = None
+
+logger = logging.getLogger(__name__)
+
+# Background event loop that owns the pooled client, so tool calls from any
+# agent thread reuse the same keep-alive connections. Agent threads only hand
+# coroutines to this loop, so the cache, stats and breaker state below are
+# single-threaded; only _prefetched is shared with callers and needs a lock
+_loop = asyncio.new_event_loop()
+threading.Thread(target=_loop.run_forever, name="rapidapi-http", daemon=True).start()
+
+# Read once; app.py loads .env before this module is imported
+RAPIDAPI_KEY = os.getenv("RAPIDAPI_KEY")
+
+# The key is the same for every endpoint, so it lives on the shared client.
+# The transport retries failed connects; 5xx replies are covered by hedging
+_client = httpx.AsyncClient(
+    headers={"X-RapidAPI-Key": RAPIDAPI_KEY or ""},
+    transport=httpx.AsyncHTTPTransport(
+        http2=True,
+        retries=2,
+        limits=httpx.Limits(max_connections=16, max_keepalive_connections=8)
+    )
+)
+
+# Searches started ahead of the agent's tool call, keyed by normalized query
+_prefetched = OrderedDict()
+_prefetch_lock = threading.Lock()
+
+# Recent successful searches; only touched from _loop, so no lock needed
+_CACHE_TTL = 300
+_CACHE_SIZE = 256
+_search_cache = OrderedDict()
+
+# (url, host, query parameter, fixed parameters) for each search API, in priority order
+_ENDPOINTS = (
+    (
+        "https://real-time-product-search.p.rapidapi.com/search",
+        "real-time-product-search.p.rapidapi.com",
+        "q",
+        {"country": "us", "language": "en", "limit": 10}
+    ),
+    (
+        "https://amazon-product-reviews-keywords.p.rapidapi.com/product/search",
+        "amazon-product-reviews-keywords.p.rapidapi.com",
+        "keyword",
+        {"country": "US"}
+    ),
+    (
+        "https://shopping-product-search.p.rapidapi.com/api/v1/search",
+        "shopping-product-search.p.rapidapi.com",
+        "query",
+        {"country": "US", "limit": 10}
+    )
+)
+
+# Where each host puts its product list and the path to every product field
+_PARSER_SPECS = {
+    "real-time-product-search.p.rapidapi.com": {
+        "root": "data",
+        "fields": {
+            "title": ("product_title",),
+            "price": ("offer", "price"),
+            "rating": ("product_rating",),
+            "image_url": ("product_photos", 0, "link"),
+            "buy_url": ("offer", "offer_page_url"),
+            "description": ("product_description",)
+        }
+    },
+    "amazon-product-reviews-keywords.p.rapidapi.com": {
+        "root": "products",
+        "fields": {
+            "title": ("title",),
+            "price": ("price", "current_price"),
+            "rating": ("reviews", "rating"),
+            "image_url": ("image",),
+            "buy_url": ("url",),
+            "description": ("description",)
+        }
+    },
+    "shopping-product-search.p.rapidapi.com": {
+        "root": "results",
+        "fields": {
+            "title": ("name",),
+            "price": ("price",),
+            "rating": ("rating",),
+            "image_url": ("image",),
+            "buy_url": ("link",),
+            "description": ("description",)
+        }
+    }
+}
+# Return up to 8 valid products, reading at most 16 raw items to find them
+_MAX_PRODUCTS = 8
+_MAX_ITEMS = 16
+
+def _walk(node, path):
+    """Follow a path of dict keys and list indexes, returning None where it breaks"""
+    for step in path:
+        if isinstance(node, dict):
+            node = node.get(step)
+        elif isinstance(node, list) and isinstance(step, int) and step < len(node):
+            node = node[step]
+        else:
+            return None
+    return node
+
+# Roughly the endpoints' p95; a request still running after this gets a twin
+_HEDGE_AFTER = 1.5
+
+# Fallback sample buckets, classified in one scan of the query
+_BUCKET_RE = re.compile(r'(?P<headphones>headphones|earbuds)|(?P<laptop>laptop)', re.IGNORECASE)
+
+# Circuit breaker: a host that fails 3 times in a row is skipped for 60s,
+# then the next search through it acts as the probe. Also loop-only state
+_FAILURE_THRESHOLD = 3
+_COOLDOWN = 60
+_host_state = {}
+
+# Moving averages of latency and success per host, used to rank the endpoints (loop-only)
+_host_stats = {host: {"ewma_ms": 500.0, "success": 0.9} for _, host, _, _ in _ENDPOINTS}
+
+def _normalize(query):
+    return " ".join(query.lower().split())
+
+async def _read_items(response, key):
+    """Parse only the first _MAX_ITEMS entries of response[key], stopping the download there"""
+    if ijson is None:
+        return orjson.loads(await response.aread())
+    
+    items = ijson.sendable_list()
+    parser = ijson.items_coro(items, f"{key}.item", use_float=True)
+    async for chunk in response.aiter_bytes():
+        parser.send(chunk)
+        if len(items) >= _MAX_ITEMS:
+            break
+    else:
+        parser.close()
+    
+    return {key: items[:_MAX_ITEMS]}
+
+def _short(text, limit=200):
+    """Truncate long descriptions, adding an ellipsis only when something was cut"""
+    return text if len(text) <= limit else text[:limit] + '...'
+
+def _circuit_open(host):
+    return _host_state.get(host, {}).get("open_until", 0) > time.monotonic()
+
+def _ranked_endpoints():
+    """Endpoints ordered by expected latency per success, best first"""
+    def cost(endpoint):
+        stats = _host_stats[endpoint[1]]
+        return stats["ewma_ms"] / max(0.01, stats["success"])
+    return sorted(_ENDPOINTS, key=cost)
+
+def _record_outcome(host, ok, elapsed_ms):
+    """Update the host's moving averages and its circuit breaker"""
+    stats = _host_stats[host]
+    stats["ewma_ms"] = 0.8 * stats["ewma_ms"] + 0.2 * elapsed_ms
+    stats["success"] = 0.9 * stats["success"] + 0.1 * ok
+    
+    state = _host_state.setdefault(host, {"fails": 0, "open_until": 0})
+    if ok:
+        state["fails"], state["open_until"] = 0, 0
+        return
+    
+    state["fails"] += 1
+    if state["fails"] >= _FAILURE_THRESHOLD:
+        state["open_until"] = time.monotonic() + _COOLDOWN
+
 class RapidAPIShoppingTool(BaseTool):
     name: str = "Product Search Tool"
     description: str = "Search for products using RapidAPI shopping endpoints"
     
+    def prefetch(self, query: str):
+        """Start a search in the background so the agent's later call for it is instant"""
+        future = asyncio.run_coroutine_threadsafe(self._search(query), _loop)
+        with _prefetch_lock:
+            _prefetched[_normalize(query)] = future
+            while len(_prefetched) > 8:
+                _prefetched.popitem(last=False)
+    
     def _run(self, query: str) -> str:
         """Search for products via RapidAPI"""
-        rapidapi_key = os.getenv("RAPIDAPI_KEY")
+        # Pick up a speculative search for the same query if one is in flight
+        with _prefetch_lock:
+            future = _prefetched.pop(_normalize(query), None)
+        if future is None:
+            future = asyncio.run_coroutine_threadsafe(self._search(query), _loop)
+        return future.result()
+    
+    def _run_batch(self, queries: list) -> list:
+        """Search several queries concurrently on the shared client, in order"""
+        async def search_all():
+            return await asyncio.gather(*(self._search(query) for query in queries))
+        
+        return asyncio.run_coroutine_threadsafe(search_all(), _loop).result()
+    
+    async def _search(self, query: str) -> str:
+        """Return a recent result for this query, or search for it"""
+        key = _normalize(query)
+        cached = _search_cache.get(key)
+        if cached and cached[0] > time.monotonic():
+            _search_cache.move_to_end(key)
+            return cached[1]
         
-        if not rapidapi_key:
-            return json.dumps({
+        result, live = await self._search_uncached(query)
+        if live:
+            _search_cache[key] = (time.monotonic() + _CACHE_TTL, result)
+            _search_cache.move_to_end(key)
+            while len(_search_cache) > _CACHE_SIZE:
+                _search_cache.popitem(last=False)
+        return result
+    
+    async def _search_uncached(self, query: str):
+        """Race the RapidAPI endpoints, returning (result JSON, whether it's live data)"""
+        if not RAPIDAPI_KEY:
+            return orjson.dumps({
                 "error": "RapidAPI key not found",
                 "products": []
-            })
+            }).decode(), False
         
-        # Try multiple working endpoints
-        endpoints_to_try = [
-            {
-                "url": "https://real-time-product-search.p.rapidapi.com/search",
-                "host": "real-time-product-search.p.rapidapi.com",
-                "params": {
-                    "q": query,
-                    "country": "us",
-                    "language": "en",
-                    "limit": 10
-                }
-            },
-            {
-                "url": "https://amazon-product-reviews-keywords.p.rapidapi.com/product/search",
-                "host": "amazon-product-reviews-keywords.p.rapidapi.com", 
-                "params": {
-                    "keyword": query,
-                    "country": "US",
-                    "category": ""
-                }
-            },
-            {
-                "url": "https://shopping-product-search.p.rapidapi.com/api/v1/search",
-                "host": "shopping-product-search.p.rapidapi.com",
-                "params": {
-                    "query": query,
-                    "country": "US",
-                    "limit": 10
-                }
-            }
+        # Hedge: query every healthy endpoint at once and take the first that returns products
+        # Connect fast or move on; hosts that have been slower or flakier get a shorter read budget
+        fetches = [
+            asyncio.create_task(self._hedged_fetch(
+                url, host, {query_param: query, **params}, httpx.Timeout(max(2, 5 - index), connect=2)
+            ))
+            for index, (url, host, query_param, params) in enumerate(_ranked_endpoints())
+            if not _circuit_open(host)
         ]
+        try:
+            for fetch in asyncio.as_completed(fetches):
+                host, products = await fetch
+                if products:
+                    return orjson.dumps({
+                        "success": True,
+                        "products": products,
+                        "total_found": len(products),
+                        "source": host
+                    }).decode(), True
+        finally:
+            for fetch in fetches:
+                fetch.cancel()
         
-        for endpoint in endpoints_to_try:
-            try:
-                headers = {
-                    "X-RapidAPI-Key": rapidapi_key,
-                    "X-RapidAPI-Host": endpoint["host"]
-                }
-                
-                response = requests.get(
-                    endpoint["url"], 
-                    headers=headers, 
-                    params=endpoint["params"], 
-                    timeout=15
-                )
-                
-                if response.status_code == 200:
-                    data = response.json()
-                    products = self._parse_response(data, endpoint["host"])
-                    
-                    if products:  # If we got valid products, return them
-                        return json.dumps({
-                            "success": True,
-                            "products": products,
-                            "total_found": len(products),
-                            "source": endpoint["host"]
-                        })
-                        
-            except Exception as e:
-                print(f"Error with {endpoint['host']}: {str(e)}")
-                continue
-        
-        # If all endpoints fail, return fallback mock data
-        return self._get_fallback_data(query)
+        # If all endpoints fail, return fallback mock data (not cached, so the next call retries)
+        return self._get_fallback_data(query), False
     
-    def _extract_asin_from_url(self, url):
-        """Extract Amazon ASIN from URL"""
-        if not url:
-            return None
-        
-        # Common Amazon ASIN patterns
-        asin_patterns = [
-            r'/dp/([A-Z0-9]{10})',
-            r'/product/([A-Z0-9]{10})',
-            r'asin=([A-Z0-9]{10})',
-            r'/([A-Z0-9]{10})(?:/|$)'
-        ]
-        
-        for pattern in asin_patterns:
-            match = re.search(pattern, url)
-            if match:
-                return match.group(1)
+    async def _hedged_fetch(self, *request):
+        """_fetch, plus a duplicate request if the first is slow; the first with products wins"""
+        attempts = [asyncio.create_task(self._fetch(*request))]
+        try:
+            done, _ = await asyncio.wait(attempts, timeout=_HEDGE_AFTER)
+            if not done:
+                attempts.append(asyncio.create_task(self._fetch(*request)))
+            
+            host, products = None, None
+            pending = set(attempts)
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for attempt in done:
+                    host, products = attempt.result()
+                    if products:
+                        return host, products
+            return host, products
+        finally:
+            for attempt in attempts:
+                attempt.cancel()
+    
+    async def _fetch(self, url, host, params, timeout):
+        """GET one endpoint and parse it, returning (host, products or None)"""
+        started = time.monotonic()
+        try:
+            async with _client.stream(
+                "GET",
+                url, 
+                headers={"X-RapidAPI-Host": host}, 
+                params=params, 
+                timeout=timeout
+            ) as response:
+                if response.status_code == 200:
+                    data = await _read_items(response, _PARSER_SPECS[host]["root"])
+                    _record_outcome(host, True, (time.monotonic() - started) * 1000)
+                    return host, self._parse_response(data, host)
+                
+        except Exception as e:
+            logger.debug("request failed host=%s err=%s", host, e)
         
-        return None
+        _record_outcome(host, False, (time.monotonic() - started) * 1000)
+        return host, None
     
     def _parse_response(self, data, host):
-        """Parse response based on the API provider"""
+        """Parse response based on the API provider's entry in _PARSER_SPECS"""
         products = []
+        spec = _PARSER_SPECS.get(host)
+        if not spec:
+            return products
         
         try:
-            if host == "real-time-product-search.p.rapidapi.com":
-                items = data.get('data', [])
-                for item in items[:8]:
-                    buy_url = item.get('offer', {}).get('offer_page_url', '')
-                    asin = self._extract_asin_from_url(buy_url)
-                    
-                    product = {
-                        'title': item.get('product_title', ''),
-                        'price': item.get('offer', {}).get('price', 'N/A'),
-                        'rating': item.get('product_rating', 'N/A'),
-                        'image_url': item.get('product_photos', [{}])[0].get('link', '') if item.get('product_photos') else '',
-                        'buy_url': buy_url,
-                        'asin': asin,  # Add ASIN for specific URLs
-                        'product_id': asin,  # Alternative field name
-                        'description': (item.get('product_description', '') or '')[:200] + '...' if item.get('product_description') else ''
-                    }
-                    # Only add if we have valid data
-                    if product['title'] and product['price'] != 'N/A':
-                        products.append(product)
-            
-            elif host == "amazon-product-reviews-keywords.p.rapidapi.com":
-                items = data.get('products', [])
-                for item in items[:8]:
-                    buy_url = item.get('url', '')
-                    asin = self._extract_asin_from_url(buy_url)
-                    
-                    product = {
-                        'title': item.get('title', ''),
-                        'price': item.get('price', {}).get('current_price', 'N/A'),
-                        'rating': item.get('reviews', {}).get('rating', 'N/A'),
-                        'image_url': item.get('image', ''),
-                        'buy_url': buy_url,
-                        'asin': asin,
-                        'product_id': asin,
-                        'description': item.get('description', '')[:200] + '...' if item.get('description') else ''
-                    }
-                    if product['title'] and product['price'] != 'N/A':
-                        products.append(product)
-            
-            elif host == "shopping-product-search.p.rapidapi.com":
-                items = data.get('results', [])
-                for item in items[:8]:
-                    buy_url = item.get('link', '')
-                    asin = self._extract_asin_from_url(buy_url)
-                    
-                    product = {
-                        'title': item.get('name', ''),
-                        'price': item.get('price', 'N/A'),
-                        'rating': item.get('rating', 'N/A'),
-                        'image_url': item.get('image', ''),
-                        'buy_url': buy_url,
-                        'asin': asin,
-                        'product_id': asin,
-                        'description': item.get('description', '')[:200] + '...' if item.get('description') else ''
-                    }
-                    if product['title'] and product['price'] != 'N/A':
-                        products.append(product)
+            fields = spec["fields"]
+            for item in data.get(spec["root"]) or []:
+                # Reject items without a title or price before building anything
+                title = _walk(item, fields["title"])
+                price = _walk(item, fields["price"])
+                if not title or price is None or price == 'N/A':
+                    continue
+                
+                buy_url = _walk(item, fields["buy_url"]) or ''
+                asin = extract_product_id_from_url(buy_url)
+                description = _walk(item, fields["description"])
+                rating = _walk(item, fields["rating"])
+                
+                products.append({
+                    'title': title,
+                    'price': price,
+                    'rating': rating if rating is not None else 'N/A',
+                    'image_url': _walk(item, fields["image_url"]) or '',
+                    'buy_url': buy_url,
+                    'asin': asin,  # Add ASIN for specific URLs
+                    'product_id': asin,  # Alternative field name
+                    'description': _short(description or '')
+                })
+                if len(products) == _MAX_PRODUCTS:
+                    break
                         
         except Exception as e:
-            print(f"Error parsing response from {host}: {str(e)}")
+            logger.debug("parse failed host=%s err=%s", host, e)
             
         return products
     
     def _get_fallback_data(self, query):
         """Return realistic fallback data when APIs fail"""
-        # Create realistic sample products based on query
-        sample_products = []
+        # Pick the prebuilt sample products that best match the query
+        match = _BUCKET_RE.search(query)
+        if match:
+            return _FALLBACK_TEMPLATES[match.lastgroup]
         
-        if "headphones" in query.lower() or "earbuds" in query.lower():
-            sample_products = [
-                {
-                    'title': 'Sony WH-CH720N Wireless Noise Canceling Headphones',
-                    'price': '$149.99',
-                    'rating': '4.4',
-                    'image_url': 'https://via.placeholder.com/300x300?text=Sony+Headphones',
-                    'buy_url': 'https://www.amazon.com/dp/B0BXQVQC1W',  # Direct ASIN link
-                    'asin': 'B0BXQVQC1W',  # Real Sony headphones ASIN
-                    'product_id': 'B0BXQVQC1W',
-                    'description': 'Wireless over-ear headphones with active noise canceling and up to 35 hours battery life.'
-                },
-                {
-                    'title': 'Apple AirPods (3rd Generation)',
-                    'price': '$179.00',
-                    'rating': '4.6',
-                    'image_url': 'https://via.placeholder.com/300x300?text=Apple+AirPods',
-                    'buy_url': 'https://www.amazon.com/dp/B0BDHB9Y8H',  # Direct ASIN link
-                    'asin': 'B0BDHB9Y8H',  # Real AirPods 3rd gen ASIN
-                    'product_id': 'B0BDHB9Y8H',
-                    'description': 'Wireless earbuds with spatial audio, MagSafe charging case, and up to 30 hours total listening time.'
-                }
-            ]
-        elif "laptop" in query.lower():
-            sample_products = [
-                {
-                    'title': 'ASUS VivoBook 15 Laptop',
-                    'price': '$599.99',
-                    'rating': '4.3',
-                    'image_url': 'https://via.placeholder.com/300x300?text=ASUS+Laptop',
-                    'buy_url': 'https://www.amazon.com/dp/B0863DW238',
-                    'asin': 'B0863DW238',
-                    'product_id': 'B0863DW238',
-                    'description': '15.6" Full HD display, Intel Core i5 processor, 8GB RAM, 512GB SSD.'
-                },
-                {
-                    'title': 'HP Pavilion 15 Laptop',
-                    'price': '$649.99',
-                    'rating': '4.2',
-                    'image_url': 'https://via.placeholder.com/300x300?text=HP+Laptop',
-                    'buy_url': 'https://www.amazon.com/dp/B08XLJ7ZBZ',
-                    'asin': 'B08XLJ7ZBZ',
-                    'product_id': 'B08XLJ7ZBZ',
-                    'description': '15.6" Full HD display, AMD Ryzen 5 processor, 8GB RAM, 256GB SSD.'
-                }
-            ]
-        else:
-            # Generic fallback with specific search URLs
-            clean_query = re.sub(r'[^\w\s]', '', query)
-            words = clean_query.split()[:3]
-            
-            sample_products = [
-                {
-                    'title': f'Best {query.title()} - Top Rated',
-                    'price': '$99.99',
-                    'rating': '4.5',
-                    'image_url': 'https://via.placeholder.com/300x300?text=Product+1',
-                    'buy_url': f'https://www.amazon.com/s?k={"+".join(words)}&crid=BESTSELLER',
-                    'asin': None,
-                    'product_id': None,
-                    'description': f'High-quality {query} with excellent reviews and fast shipping.'
-                },
-                {
-                    'title': f'Premium {query.title()} - Amazon Choice',
-                    'price': '$149.99',
-                    'rating': '4.7',
-                    'image_url': 'https://via.placeholder.com/300x300?text=Product+2',
-                    'buy_url': f'https://www.amazon.com/s?k={"+".join(words)}+premium&crid=AMAZONCHOICE',
-                    'asin': None,
-                    'product_id': None,
-                    'description': f'Premium {query} with advanced features and excellent customer satisfaction.'
-                }
-            ]
+        # Generic fallback with specific search URLs for the first few words
+        search_words = quote_plus(" ".join(query.split()[:3]))
         
-        return json.dumps({
-            "success": True,
-            "products": sample_products,
-            "total_found": len(sample_products),
-            "source": "fallback_data",
-            "note": "API endpoints unavailable, showing sample results with working product links."
-        })
\ No newline at end of file
+        return (
+            _FALLBACK_TEMPLATES["default"]
+            .replace("__QUERY_TITLE__", _json_text(query.title()))
+            .replace("__QUERY__", _json_text(query))
+            .replace("__SEARCH_WORDS__", search_words)
+        )
+
+def _json_text(value):
+    """Escape a string for splicing into an already-serialized JSON string"""
+    return orjson.dumps(value).decode()[1:-1]
+
+def _fallback_blob(sample_products):
+    return orjson.dumps({
+        "success": True,
+        "products": sample_products,
+        "total_found": len(sample_products),
+        "source": "fallback_data",
+        "note": "API endpoints unavailable, showing sample results with working product links."
+    }).decode()
+
+# Fallback responses serialized once at import; the generic one has
+# __QUERY__-style placeholders filled in per call
+_FALLBACK_TEMPLATES = {
+    "headphones": _fallback_blob([
+        {
+            'title': 'Sony WH-CH720N Wireless Noise Canceling Headphones',
+            'price': '$149.99',
+            'rating': '4.4',
+            'image_url': 'https://via.placeholder.com/300x300?text=Sony+Headphones',
+            'buy_url': 'https://www.amazon.com/dp/B0BXQVQC1W',  # Direct ASIN link
+            'asin': 'B0BXQVQC1W',  # Real Sony headphones ASIN
+            'product_id': 'B0BXQVQC1W',
+            'description': 'Wireless over-ear headphones with active noise canceling and up to 35 hours battery life.'
+        },
+        {
+            'title': 'Apple AirPods (3rd Generation)',
+            'price': '$179.00',
+            'rating': '4.6',
+            'image_url': 'https://via.placeholder.com/300x300?text=Apple+AirPods',
+            'buy_url': 'https://www.amazon.com/dp/B0BDHB9Y8H',  # Direct ASIN link
+            'asin': 'B0BDHB9Y8H',  # Real AirPods 3rd gen ASIN
+            'product_id': 'B0BDHB9Y8H',
+            'description': 'Wireless earbuds with spatial audio, MagSafe charging case, and up to 30 hours total listening time.'
+        }
+    ]),
+    "laptop": _fallback_blob([
+        {
+            'title': 'ASUS VivoBook 15 Laptop',
+            'price': '$599.99',
+            'rating': '4.3',
+            'image_url': 'https://via.placeholder.com/300x300?text=ASUS+Laptop',
+            'buy_url': 'https://www.amazon.com/dp/B0863DW238',
+            'asin': 'B0863DW238',
+            'product_id': 'B0863DW238',
+            'description': '15.6" Full HD display, Intel Core i5 processor, 8GB RAM, 512GB SSD.'
+        },
+        {
+            'title': 'HP Pavilion 15 Laptop',
+            'price': '$649.99',
+            'rating': '4.2',
+            'image_url': 'https://via.placeholder.com/300x300?text=HP+Laptop',
+            'buy_url': 'https://www.amazon.com/dp/B08XLJ7ZBZ',
+            'asin': 'B08XLJ7ZBZ',
+            'product_id': 'B08XLJ7ZBZ',
+            'description': '15.6" Full HD display, AMD Ryzen 5 processor, 8GB RAM, 256GB SSD.'
+        }
+    ]),
+    "default": _fallback_blob([
+        {
+            'title': 'Best __QUERY_TITLE__ - Top Rated',
+            'price': '$99.99',
+            'rating': '4.5',
+            'image_url': 'https://via.placeholder.com/300x300?text=Product+1',
+            'buy_url': 'https://www.amazon.com/s?k=__SEARCH_WORDS__&crid=BESTSELLER',
+            'asin': None,
+            'product_id': None,
+            'description': 'High-quality __QUERY__ with excellent reviews and fast shipping.'
+        },
+        {
+            'title': 'Premium __QUERY_TITLE__ - Amazon Choice',
+            'price': '$149.99',
+            'rating': '4.7',
+            'image_url': 'https://via.placeholder.com/300x300?text=Product+2',
+            'buy_url': 'https://www.amazon.com/s?k=__SEARCH_WORDS__+premium&crid=AMAZONCHOICE',
+            'asin': None,
+            'product_id': None,
+            'description': 'Premium __QUERY__ with advanced features and excellent customer satisfaction.'
+        }
+    ])
+}
@@ -0,0 +1,38 @@
+import json
+from typing import List, Optional, Type
+
+# Fixed import for newer CrewAI versions
+try:
+    from crewai.tools import BaseTool
+except ImportError:
+    try:
+        from crewai_tools import BaseTool
+    except ImportError:
+        from crewai.tool import BaseTool
+
+from pydantic import BaseModel, Field
+
+from agents.schemas import Product
+
+class SubmitResultsInput(BaseModel):
+    products: List[Product] = Field(..., description="Every product found for the user's query")
+    source: Optional[str] = Field(None, description="Data source reported by the Product Search Tool")
+    note: Optional[str] = Field(None, description="Any note reported by the Product Search Tool")
+
+class SubmitResultsTool(BaseTool):
+    name: str = "Submit Results"
+    description: str = (
+        "Submit the final list of products. Always call this as your last action "
+        "instead of writing the JSON answer yourself."
+    )
+    args_schema: Type[BaseModel] = SubmitResultsInput
+    # The tool's output becomes the task's final answer, saving another LLM round
+    result_as_answer: bool = True
+
+    def _run(self, products: list, source: str = None, note: str = None) -> str:
+        """Return the submitted products as the research task's answer"""
+        return json.dumps({
+            "products": [p.model_dump() if isinstance(p, BaseModel) else p for p in products],
+            "source": source,
+            "note": note
+        })
@@ -0,0 +1,25 @@
+import json
+
+# Batches beyond ~8 queries start to hurt latency more than they save calls
+DEFAULT_BATCH_SIZE = 8
+
+def chunk_queries(queries, k=DEFAULT_BATCH_SIZE):
+    """Split queries into groups of at most k"""
+    return [queries[i:i + k] for i in range(0, len(queries), k)]
+
+def marshal_queries(queries, instruction="Analyze each of the following queries"):
+    """Pack several queries into a single prompt that asks for one result per query"""
+    return (
+        f'{instruction}. JSON only: {{"results": [...]}} with one object per query, '
+        f"in the same order: {json.dumps(queries)}"
+    )
+
+def unmarshal_results(payload, expected):
+    """Split a parsed {"results": [...]} response back into one result per query"""
+    results = payload.get("results")
+    if not isinstance(results, list):
+        results = []
+
+    # Pad or trim so every query gets exactly one (possibly empty) result
+    results = [result if isinstance(result, dict) else {} for result in results[:expected]]
+    return results + [{}] * (expected - len(results))
@@ -1,6 +1,53 @@
-import json
+import logging
 import re
-import streamlit as st
+from functools import lru_cache
+from urllib.parse import quote_plus
+
+# orjson parses agent output faster; fall back to the stdlib if it's missing
+try:
+    from orjson import loads as _json_loads, JSONDecodeError
+except ImportError:
+    from json import loads as _json_loads, JSONDecodeError
+
+logger = logging.getLogger(__name__)
+
+# Compiled once instead of going through re's pattern cache on every call
+# Links and images that are never worth showing, matched in a single case-insensitive scan
+_INVALID_URL_RE = re.compile(r'example\.com|placeholder|amazon\.com/gp/help|localhost|127\.0\.0\.1', re.IGNORECASE)
+_INVALID_IMAGE_RE = re.compile(r'placeholder|example\.com|amazon\.com/gp', re.IGNORECASE)
+_DIGITS = re.compile(r'\d+')
+# Amazon ASINs after /dp/, /product/ or asin=, then as a bare path segment only if those miss
+_ASIN_RE = re.compile(r'(?:/dp/|/product/|asin=)(?P<asin>[A-Z0-9]{10})')
+_BARE_ASIN_RE = re.compile(r'/(?P<asin>[A-Z0-9]{10})(?:/|$)')
+
+def extract_json_obj(text):
+    """Return the first balanced {...} object in text, or None"""
+    start = text.find('{')
+    if start < 0:
+        return None
+    
+    # Count braces outside of string literals, stopping as soon as the object closes
+    depth = 0
+    in_string = escaped = False
+    for index in range(start, len(text)):
+        char = text[index]
+        if in_string:
+            if escaped:
+                escaped = False
+            elif char == '\\':
+                escaped = True
+            elif char == '"':
+                in_string = False
+        elif char == '"':
+            in_string = True
+        elif char == '{':
+            depth += 1
+        elif char == '}':
+            depth -= 1
+            if depth == 0:
+                return text[start:index + 1]
+    
+    return None
 
 def clean_json_response(response_text):
     """Clean and parse JSON response from agents"""
@@ -9,145 +56,122 @@ def clean_json_response(response_text):
         if isinstance(response_text, dict):
             return response_text
         
-        # Remove markdown code blocks
-        cleaned = re.sub(r'```json\s*', '', response_text)
-        cleaned = re.sub(r'```\s*$', '', cleaned)
+        if not isinstance(response_text, str):
+            raise TypeError(f"expected a string, got {type(response_text).__name__}")
         
-        # Remove any leading/trailing whitespace
-        cleaned = cleaned.strip()
+        # Agents often return clean JSON already, so try that before scanning.
+        # Only an object counts; a list or string still goes through the scan
+        try:
+            parsed = _json_loads(response_text)
+            if isinstance(parsed, dict):
+                return parsed
+        except JSONDecodeError:
+            pass
         
-        # Try to find JSON in the text
-        json_match = re.search(r'\{.*\}', cleaned, re.DOTALL)
-        if json_match:
-            json_str = json_match.group()
-            return json.loads(json_str)
+        # Find the JSON object in the text; anchoring on braces skips any markdown fences
+        json_str = extract_json_obj(response_text)
+        if json_str:
+            return _json_loads(json_str)
         
-        # If no JSON found, try parsing the whole thing
-        return json.loads(cleaned)
+        # The whole text was already tried above, and it wasn't an object
+        logger.warning("No JSON object in response")
+        return {"error": "Could not parse response", "products": []}
         
-    except json.JSONDecodeError as e:
-        st.error(f"JSON parsing error: {e}")
+    except JSONDecodeError as e:
+        # Malformed agent output is common; log it rather than redrawing the UI each time
+        logger.warning("JSON parsing error: %s", e)
         return {"error": "Could not parse response", "products": []}
-    except Exception as e:
-        st.error(f"Unexpected error: {e}")
+    except TypeError as e:
+        logger.warning("Unexpected response type: %s", e)
         return {"error": str(e), "products": []}
 
-def format_product_card(product):
-    """Format product information in a nice card layout"""
-    try:
-        # Get product details with fallbacks
-        title = product.get('title', product.get('Title', 'Unknown Product'))
-        price = product.get('price', product.get('Price', 'N/A'))
-        rating = product.get('rating', product.get('Rating', 'N/A'))
-        description = product.get('description', product.get('Brief description', product.get('description', 'No description available')))
-        image_url = product.get('image_url', product.get('Image URL', ''))
-        
-        # IMPROVED: Try multiple URL fields and use product ID for specific URLs
-        buy_url = product.get('buy_url', product.get('purchase_url', product.get('Purchase URL', product.get('url', ''))))
-        product_id = product.get('asin', product.get('product_id', product.get('id', '')))
-        
-        # Clean up rating format (remove extra /5/5)
-        if isinstance(rating, str) and '/5/5' in rating:
-            rating = rating.replace('/5/5', '/5')
-        
-        # Create two columns for layout
-        col1, col2 = st.columns([1, 2])
-        
-        with col1:
-            # Display product image
-            if image_url and image_url.strip() and not any(x in image_url.lower() for x in ['placeholder', 'example.com', 'amazon.com/gp']):
-                try:
-                    st.image(image_url, width=200, caption=title)
-                except Exception:
-                    st.markdown("🖼️ *Image not available*")
-            else:
-                st.markdown("🖼️ *No image available*")
-        
-        with col2:
-            # Product details
-            st.markdown(f"**💰 Price:** {price}")
-            st.markdown(f"**⭐ Rating:** {rating}")
-            
-            if description and description != 'No description available':
-                st.markdown(f"**📝 Description:** {description}")
-            else:
-                st.markdown("**📝 Description:** *No description available*")
-            
-            # IMPROVED: Better URL handling with specific product links
-            if buy_url and buy_url.strip() and buy_url != 'N/A' and validate_url(buy_url):
-                # Use the specific product URL
-                st.link_button("🛒 View Product", buy_url, help="Click to view this product")
-            elif product_id:
-                # Create specific Amazon product URL using ASIN/Product ID
-                specific_url = f"https://www.amazon.com/dp/{product_id}"
-                st.link_button("🛒 View Product", specific_url, help="Click to view this specific product")
-            else:
-                # Create a more specific search as fallback
-                search_url = create_specific_search_url(title, price)
-                st.link_button("🔍 Find This Product", search_url, help="Search for this specific product")
+def clean_json_responses(responses):
+    """Clean and parse several agent responses, taking the fast path for clean JSON"""
+    loads, parse = _json_loads, clean_json_response
+    results = []
+    for response in responses:
+        try:
+            parsed = response if isinstance(response, dict) else loads(response)
+        except (JSONDecodeError, TypeError):
+            parsed = None
+        results.append(parsed if isinstance(parsed, dict) else parse(response))
+    return results
+
+# Keys the agents use for each canonical product field, in order of preference
+# (after lowercasing and turning spaces into underscores)
+PRODUCT_FIELDS = {
+    'title': ('title',),
+    'price': ('price',),
+    'rating': ('rating',),
+    'description': ('description', 'brief_description'),
+    'image_url': ('image_url',),
+    'buy_url': ('buy_url', 'purchase_url', 'url'),
+    'product_id': ('asin', 'product_id', 'id')
+}
+
+PRODUCT_DEFAULTS = {
+    'title': 'Unknown Product',
+    'price': 'N/A',
+    'rating': 'N/A',
+    'description': 'No description available',
+    'image_url': '',
+    'buy_url': '',
+    'product_id': ''
+}
+
+def canonicalize_product(product):
+    """Map a product's keys onto the canonical lowercase schema"""
+    # One pass over the keys so "Image URL" and "image_url" land on the same alias
+    lowered = {key.lower().replace(' ', '_'): value for key, value in product.items()}
+    
+    canonical = {}
+    for field, aliases in PRODUCT_FIELDS.items():
+        canonical[field] = next(
+            (lowered[alias] for alias in aliases if lowered.get(alias) not in (None, '')),
+            PRODUCT_DEFAULTS[field]
+        )
     
-    except Exception as e:
-        st.error(f"Error displaying product: {e}")
-        st.write("**Product data:**", product)
+    return canonical
 
+def displayable_image_url(image_url):
+    """Return the image URL if it's worth rendering, else None"""
+    if isinstance(image_url, str) and image_url.strip() and not _INVALID_IMAGE_RE.search(image_url):
+        return image_url
+    return None
+
+# Called for the same URLs on every rerun; lru_cache skips st.cache_data's pickling
+@lru_cache(maxsize=4096)
 def validate_url(url):
     """Simple URL validation"""
     if not url or url == 'N/A':
         return False
     
     # Check for common invalid patterns
-    invalid_patterns = [
-        'example.com',
-        'placeholder',
-        'amazon.com/gp/help',
-        'localhost',
-        '127.0.0.1'
-    ]
-    
-    for pattern in invalid_patterns:
-        if pattern in url.lower():
-            return False
+    if _INVALID_URL_RE.search(url):
+        return False
     
     return url.startswith(('http://', 'https://'))
 
+@lru_cache(maxsize=4096)
 def create_search_fallback_url(product_title):
     """Create a search URL as fallback when direct links don't work"""
-    clean_title = re.sub(r'[^\w\s]', '', product_title)  # Remove special characters
-    search_query = clean_title.replace(' ', '+')
-    return f"https://www.amazon.com/s?k={search_query}"
+    return f"https://www.amazon.com/s?k={quote_plus(product_title)}"
 
 def create_specific_search_url(title, price):
     """Create a more specific search URL using title and price"""
-    # Clean the title and add price range if available
-    clean_title = re.sub(r'[^\w\s]', '', title)
-    search_query = clean_title.replace(' ', '+')
-    
-    # Try to extract price number for better search
+    # Try to extract price number and add a price range to the search
     if price and price != 'N/A':
-        price_match = re.search(r'\d+', str(price))
+        price_match = _DIGITS.search(str(price))
         if price_match:
-            price_num = int(price_match.group())
-            # Add price range to search
-            search_query += f"+under+{price_num + 50}"
+            title = f"{title} under {int(price_match.group()) + 50}"
     
-    return f"https://www.amazon.com/s?k={search_query}&ref=sr_st_price-asc-rank"
+    return f"{create_search_fallback_url(title)}&ref=sr_st_price-asc-rank"
 
+@lru_cache(maxsize=4096)
 def extract_product_id_from_url(url):
     """Extract Amazon ASIN or product ID from URL"""
     if not url:
         return None
     
-    # Try to extract ASIN from Amazon URLs
-    asin_patterns = [
-        r'/dp/([A-Z0-9]{10})',
-        r'/product/([A-Z0-9]{10})',
-        r'asin=([A-Z0-9]{10})',
-        r'/([A-Z0-9]{10})(?:/|$)'
-    ]
-    
-    for pattern in asin_patterns:
-        match = re.search(pattern, url)
-        if match:
-            return match.group(1)
-    
-    return None
\ No newline at end of file
+    match = _ASIN_RE.search(url) or _BARE_ASIN_RE.search(url)
+    return match.group('asin') if match else None
\ No newline at end of file
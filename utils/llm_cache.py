@@ -0,0 +1,272 @@
+import asyncio
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+import litellm
+from crewai import LLM
+from litellm.exceptions import RateLimitError
+from tenacity import retry, retry_if_exception_type, stop_after_attempt, wait_exponential_jitter
+
+# Optional local embedding model for near-duplicate query matching
+try:
+    from sentence_transformers import SentenceTransformer
+except ImportError:
+    SentenceTransformer = None
+
+EMBEDDING_MODEL = "sentence-transformers/all-MiniLM-L6-v2"
+SIMILARITY_THRESHOLD = 0.92
+
+# Cached responses expire so stale prices and stock don't stick around forever
+CACHE_TTL_SECONDS = int(os.getenv("LLM_CACHE_TTL", "3600"))
+
+# Semantic scope for whole crew results, as opposed to single LLM calls
+RESULT_SCOPE = "crew-result"
+
+# The user query the current crew run is answering
+_current_query = ContextVar("current_query", default=None)
+
+@contextmanager
+def query_scope(user_query):
+    """Tag every LLM call made inside the block with the user's query"""
+    token = _current_query.set(user_query)
+    try:
+        yield
+    finally:
+        _current_query.reset(token)
+
+class LLMCache:
+    """In-process cache of LLM responses with exact and semantic lookups"""
+
+    def __init__(self, threshold=SIMILARITY_THRESHOLD, max_entries=512, ttl=CACHE_TTL_SECONDS):
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._exact = OrderedDict()
+        self._semantic = {}
+        self._encoder = None
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def cache_key(model, messages, tools=None, temperature=None):
+        """Hash everything that determines an LLM response"""
+        payload = {
+            "model": model,
+            "messages": messages,
+            "tools": tools,
+            "deterministic": temperature == 0
+        }
+        return hashlib.sha256(json.dumps(payload, sort_keys=True, default=str).encode()).hexdigest()
+
+    @staticmethod
+    def scope_key(model, messages):
+        """Identify the agent and step a prompt belongs to, ignoring the query"""
+        if isinstance(messages, str):
+            system_prompt, depth = "", 1
+        else:
+            system_prompt, depth = messages[0].get("content", ""), len(messages)
+        payload = {"model": model, "system": system_prompt, "depth": depth}
+        return hashlib.sha256(json.dumps(payload, sort_keys=True, default=str).encode()).hexdigest()
+
+    def get(self, key):
+        """Return the cached response for an exact key, if any"""
+        with self._lock:
+            if key not in self._exact:
+                return None
+            expires_at, response = self._exact[key]
+            if expires_at < time.monotonic():
+                del self._exact[key]
+                return None
+            self._exact.move_to_end(key)
+            return response
+
+    def set(self, key, response):
+        """Store a response under an exact key"""
+        with self._lock:
+            self._exact[key] = (time.monotonic() + self.ttl, response)
+            self._exact.move_to_end(key)
+            while len(self._exact) > self.max_entries:
+                self._exact.popitem(last=False)
+
+    def get_similar(self, scope, query):
+        """Return a response cached for a near-duplicate query in the same scope"""
+        embedding = self._embed(query)
+        if embedding is None:
+            return None
+
+        now = time.monotonic()
+        with self._lock:
+            entries = [entry for entry in self._semantic.get(scope, []) if entry[0] >= now]
+            self._semantic[scope] = entries
+
+        best_score, best_response = 0.0, None
+        for _, cached_embedding, response in entries:
+            score = float(embedding @ cached_embedding)
+            if score > best_score:
+                best_score, best_response = score, response
+
+        return best_response if best_score >= self.threshold else None
+
+    def add_similar(self, scope, query, response):
+        """Remember a response for semantic lookups of similar queries"""
+        embedding = self._embed(query)
+        if embedding is None:
+            return
+
+        with self._lock:
+            entries = self._semantic.setdefault(scope, [])
+            entries.append((time.monotonic() + self.ttl, embedding, response))
+            del entries[:-self.max_entries]
+
+    def record(self, hit):
+        """Count a lookup for the sidebar stats"""
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def stats(self):
+        """Hit/miss counters and the current number of exact entries"""
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "entries": len(self._exact)}
+
+    @staticmethod
+    def result_key(query):
+        """Key for the full set of task outputs produced for a query"""
+        return hashlib.sha256(("result:" + " ".join(query.lower().split())).encode()).hexdigest()
+
+    def get_result(self, query):
+        """Return cached task outputs for this query or a near-duplicate of it"""
+        cached = self.get(self.result_key(query))
+        if cached is None:
+            cached = self.get_similar(RESULT_SCOPE, query)
+        self.record(cached is not None)
+        return cached
+
+    def store_result(self, query, task_outputs):
+        """Remember the raw task outputs of a finished crew run"""
+        self.set(self.result_key(query), task_outputs)
+        self.add_similar(RESULT_SCOPE, query, task_outputs)
+
+    def _embed(self, text):
+        """Embed text with the local model, or None when it isn't installed"""
+        if SentenceTransformer is None or not text:
+            return None
+
+        with self._lock:
+            if self._encoder is None:
+                self._encoder = SentenceTransformer(EMBEDDING_MODEL)
+
+        return self._encoder.encode(" ".join(text.lower().split()), normalize_embeddings=True)
+
+# Shared by every agent so repeat queries skip the Groq round-trip
+llm_cache = LLMCache()
+
+# Process-wide cap on in-flight Groq requests. A thread semaphore rather than
+# an asyncio one, since calls come from several event loops and worker threads
+GROQ_MAX_CONCURRENCY = int(os.getenv("GROQ_MAX_CONCURRENCY", "5"))
+_groq_slots = threading.BoundedSemaphore(GROQ_MAX_CONCURRENCY)
+
+def _release_abandoned_slot(acquire):
+    """Give back a slot whose waiter was cancelled before the thread got it"""
+    if not acquire.cancelled() and acquire.exception() is None:
+        _groq_slots.release()
+
+async def _acquire_groq_slot():
+    """Wait for a Groq slot in a thread, queueing fairly with the sync callers"""
+    acquire = asyncio.ensure_future(asyncio.to_thread(_groq_slots.acquire))
+    try:
+        await asyncio.shield(acquire)
+    except asyncio.CancelledError:
+        # The thread still takes the slot, so hand it back once it does
+        acquire.add_done_callback(_release_abandoned_slot)
+        raise
+
+# Back off with jitter on 429s so concurrent agents don't retry in lockstep
+_retry_on_rate_limit = retry(
+    retry=retry_if_exception_type(RateLimitError),
+    wait=wait_exponential_jitter(initial=1, max=20),
+    stop=stop_after_attempt(4),
+    reraise=True
+)
+
+class CachedLLM(LLM):
+    """LLM that answers repeat and near-duplicate prompts from the shared cache"""
+
+    def call(self, messages, *args, **kwargs):
+        tools = kwargs.get("tools", args[0] if args else None)
+        key, scope, query, cached = self._lookup(messages, tools)
+        if cached is not None:
+            return cached
+
+        response = self._call_groq(messages, *args, **kwargs)
+
+        # Tool-call payloads are not plain text and depend on the live call
+        if isinstance(response, str):
+            self._remember(key, scope, query, response)
+
+        return response
+
+    async def astream(self, messages, on_token=None):
+        """Async streamed completion for tool-less prompts, through the same cache"""
+        key, scope, query, cached = self._lookup(messages)
+        if cached is not None:
+            return cached
+
+        response = await self._acall_groq(messages, on_token)
+        self._remember(key, scope, query, response)
+        return response
+
+    def _lookup(self, messages, tools=None):
+        """Check the exact cache, then the semantic one for the current query"""
+        key = llm_cache.cache_key(self.model, messages, tools, getattr(self, "temperature", None))
+        query = _current_query.get()
+        scope = llm_cache.scope_key(self.model, messages)
+
+        cached = llm_cache.get(key)
+        if cached is None and query:
+            cached = llm_cache.get_similar(scope, query)
+
+        llm_cache.record(cached is not None)
+        return key, scope, query, cached
+
+    def _remember(self, key, scope, query, response):
+        llm_cache.set(key, response)
+        if query:
+            llm_cache.add_similar(scope, query, response)
+
+    @_retry_on_rate_limit
+    def _call_groq(self, messages, *args, **kwargs):
+        with _groq_slots:
+            return super().call(messages, *args, **kwargs)
+
+    @_retry_on_rate_limit
+    async def _acall_groq(self, messages, on_token=None):
+        await _acquire_groq_slot()
+        try:
+            stream = await litellm.acompletion(
+                model=self.model,
+                messages=messages,
+                temperature=getattr(self, "temperature", None),
+                stream=True
+            )
+
+            parts = []
+            async for chunk in stream:
+                text = chunk.choices[0].delta.content or ""
+                if text:
+                    parts.append(text)
+                    if on_token:
+                        on_token(text)
+        finally:
+            _groq_slots.release()
+
+        return "".join(parts)
@@ -0,0 +1,120 @@
+import asyncio
+from functools import lru_cache
+
+from crewai.tasks.task_output import TaskOutput
+from crewai.utilities import RPMController
+from pydantic import ValidationError
+
+from utils.helpers import extract_json_obj
+
+# Same separator CrewAI uses when it joins context outputs
+CONTEXT_SEPARATOR = "\n\n----------\n\n"
+
+@lru_cache(maxsize=None)
+def shared_rpm_controller(max_rpm):
+    """One RPMController per limit for the whole process
+    
+    CrewAI agents keep the first controller they're given, and each one
+    runs its own reset timer, so a fresh controller per run would be
+    ignored and leak its timer thread.
+    """
+    return RPMController(max_rpm=max_rpm)
+
+def _dependencies(tasks, index):
+    """Tasks whose output a task reads: its explicit context, else the previous task"""
+    task = tasks[index]
+    if isinstance(task.context, list):
+        return task.context
+    return [tasks[index - 1]] if index else []
+
+def _skipped(task):
+    """Empty output for a task the pipeline didn't run"""
+    task.output = TaskOutput(
+        description=task.description,
+        expected_output=task.expected_output,
+        raw="",
+        agent=task.agent.role
+    )
+    return task.output
+
+async def _complete(task, context, on_token=None):
+    """Run a tool-less task as one async LLM call, skipping the agent executor loop"""
+    agent = task.agent
+
+    rpm_controller = getattr(agent, "_rpm_controller", None)
+    if rpm_controller:
+        await asyncio.to_thread(rpm_controller.check_or_wait)
+
+    messages = [
+        {"role": "system", "content": f"You are {agent.role}. {agent.backstory}\nYour personal goal is: {agent.goal}"},
+        {"role": "user", "content": (
+            f"{task.description}\n\nExpected output: {task.expected_output}"
+            f"\n\nContext:\n{context}"
+        )}
+    ]
+    emit = (lambda text: on_token(agent.role, text)) if on_token else None
+    raw = await agent.llm.astream(messages, on_token=emit)
+
+    pydantic = None
+    json_str = extract_json_obj(raw)
+    if task.output_pydantic and json_str:
+        try:
+            pydantic = task.output_pydantic.model_validate_json(json_str)
+        except ValidationError:
+            pass
+
+    task.output = TaskOutput(
+        description=task.description,
+        expected_output=task.expected_output,
+        raw=raw,
+        pydantic=pydantic,
+        agent=agent.role
+    )
+    return task.output
+
+async def run_pipeline_async(tasks, on_task_done=None, on_token=None, max_rpm=None, stop_when=None):
+    """Run tasks as a dependency DAG instead of CrewAI's sequential loop
+
+    Every task starts as soon as the tasks in its context have finished, so
+    independent branches (analysis and recommendation) overlap. Agents with
+    tools go through CrewAI's executor in a thread; the rest are a single
+    litellm.acompletion whose tokens go to on_token(role, text). Once
+    stop_when(output) is true for a finished task, tasks that haven't started
+    yet are skipped. Returns a crew-result-shaped {"tasks_output": [...]} in
+    the original task order.
+    """
+    # One rate limiter shared by every agent and run, like Crew(max_rpm=...)
+    if max_rpm:
+        rpm_controller = shared_rpm_controller(max_rpm)
+        for agent in {id(task.agent): task.agent for task in tasks}.values():
+            agent.set_rpm_controller(rpm_controller)
+
+    runs = {}
+    stopped = False
+
+    async def run(index, task):
+        nonlocal stopped
+        upstream = [await runs[id(dependency)] for dependency in _dependencies(tasks, index)]
+        if stopped:
+            return _skipped(task)
+
+        # Conditional tasks decide from the output right before them
+        if hasattr(task, "should_execute") and not task.should_execute(upstream[-1]):
+            return task.get_skipped_task_output()
+
+        context = CONTEXT_SEPARATOR.join(output.raw for output in upstream if output.raw)
+        if task.agent.tools:
+            output = await asyncio.to_thread(task.execute_sync, agent=task.agent, context=context)
+        else:
+            output = await _complete(task, context, on_token)
+
+        if on_task_done:
+            on_task_done(output)
+        if stop_when and stop_when(output):
+            stopped = True
+        return output
+
+    for index, task in enumerate(tasks):
+        runs[id(task)] = asyncio.ensure_future(run(index, task))
+
+    return {"tasks_output": list(await asyncio.gather(*runs.values()))}
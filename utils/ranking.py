@@ -0,0 +1,39 @@
+import re
+
+import numpy as np
+
+# Fewer products than this isn't worth skipping the LLM comparison for
+FAST_PATH_MIN_PRODUCTS = 3
+
+RATING_WEIGHT = 0.7
+VALUE_WEIGHT = 0.3
+
+def _to_number(value):
+    """Pull the first number out of a price or rating like "$1,299.99" or "4.5/5", else NaN"""
+    if isinstance(value, (int, float)):
+        return float(value)
+
+    match = re.search(r'\d[\d,]*(?:\.\d+)?', str(value or ''))
+    return float(match.group().replace(',', '')) if match else np.nan
+
+def top_pick(products, min_products=FAST_PATH_MIN_PRODUCTS):
+    """Pick the best product by rating and price, or None if too few are comparable
+
+    Score is (rating / 5) * 0.7 + value * 0.3, where value is 1 for the
+    cheapest product and 0 for the most expensive.
+    """
+    # Unparseable prices and ratings become NaN and drop out of the mask
+    prices = np.array([_to_number(p.get('price')) for p in products], dtype=np.float32)
+    ratings = np.array([_to_number(p.get('rating')) for p in products], dtype=np.float32)
+    comparable = np.flatnonzero((prices > 0) & ~np.isnan(ratings))
+
+    if comparable.size < min_products:
+        return None
+
+    prices, ratings = prices[comparable], np.clip(ratings[comparable], 0, 5)
+
+    spread = prices.max() - prices.min()
+    value = 1 - (prices - prices.min()) / spread if spread else np.ones_like(prices)
+    scores = (ratings / 5) * RATING_WEIGHT + value * VALUE_WEIGHT
+
+    return products[int(comparable[scores.argmax()])]
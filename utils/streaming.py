@@ -0,0 +1,44 @@
+import asyncio
+import contextvars
+import queue
+import threading
+
+from utils.pipeline import run_pipeline_async
+
+def stream_pipeline(tasks, max_rpm=None, stop_when=None):
+    """Run the task DAG in a worker thread and yield its events as they happen
+
+    Yields ("token", agent_role, text) for every chunk a tool-less agent
+    streams, ("task", task_output) whenever a task completes, and a final
+    ("result", pipeline_output) once every task has finished.
+    """
+    events = queue.Queue()
+    outcome = {}
+
+    def run():
+        try:
+            outcome["result"] = asyncio.run(run_pipeline_async(
+                tasks,
+                on_task_done=lambda task_output: events.put(("task", task_output)),
+                on_token=lambda role, text: events.put(("token", role, text)),
+                max_rpm=max_rpm,
+                stop_when=stop_when
+            ))
+        except Exception as e:
+            outcome["error"] = e
+        finally:
+            events.put(None)
+
+    # Copy the context so query_scope() applies inside the worker. Tool-using
+    # agents aren't streamed: CrewAI's event bus is process-global, so its
+    # chunks can't be told apart between concurrent sessions
+    context = contextvars.copy_context()
+    threading.Thread(target=context.run, args=(run,), daemon=True).start()
+
+    while (event := events.get()) is not None:
+        yield event
+
+    if "error" in outcome:
+        raise outcome["error"]
+
+    yield ("result", outcome["result"])
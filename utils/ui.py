@@ -0,0 +1,94 @@
+import streamlit as st
+from streamlit.errors import StreamlitAPIException
+
+from utils.helpers import create_specific_search_url, displayable_image_url, validate_url
+
+def render_product_gallery(products, width=160):
+    """Render every product image as one st.image gallery instead of one widget each"""
+    shown = [(url, str(p['title'])) for p in products if (url := displayable_image_url(p['image_url']))]
+    if not shown:
+        return
+    
+    urls, captions = zip(*shown)
+    try:
+        st.image(list(urls), caption=list(captions), width=width)
+    except (StreamlitAPIException, TypeError, ValueError):
+        st.markdown("🖼️ *Images not available*")
+
+@st.cache_data(max_entries=1024, show_spinner=False)
+def _card_fields(product):
+    """Normalize a canonicalized product for display, cached across reruns"""
+    # Values come straight from the LLM, so don't assume they're strings
+    title = str(product['title'])
+    rating = product['rating']
+    description = str(product['description'] or '')
+    buy_url = str(product['buy_url'] or '')
+    product_id = str(product['product_id'] or '')
+    
+    # Clean up rating format (remove extra /5/5)
+    rating = rating.replace('/5/5', '/5') if isinstance(rating, str) else rating
+    
+    if not description or description == 'No description available':
+        description = "*No description available*"
+    
+    # IMPROVED: Better URL handling with specific product links
+    if buy_url and buy_url.strip() and buy_url != 'N/A' and validate_url(buy_url):
+        # Use the specific product URL
+        link = ("🛒 View Product", buy_url, "Click to view this product")
+    elif product_id:
+        # Create specific Amazon product URL using ASIN/Product ID
+        link = ("🛒 View Product", f"https://www.amazon.com/dp/{product_id}", "Click to view this specific product")
+    else:
+        # Create a more specific search as fallback
+        link = ("🔍 Find This Product", create_specific_search_url(title, product['price']), "Search for this specific product")
+    
+    return title, product['price'], rating, description, displayable_image_url(product['image_url']), link
+
+@st.fragment
+def render_product_list(products):
+    """Render the gallery and product cards as a fragment that reruns on its own"""
+    # All images in one gallery widget; the cards keep their buttons
+    render_product_gallery(products)
+    
+    for idx, product in enumerate(products):
+        with st.container():
+            st.markdown(f"### #{idx + 1} - {product['title']}")
+            format_product_card(product, show_image=False)
+            st.divider()
+
+def format_product_card(product, show_image=True):
+    """Format a canonicalized product in a nice card layout
+    
+    Pass show_image=False when the images were already rendered by render_product_gallery.
+    """
+    try:
+        title, price, rating, description, image_url, (link_label, link_url, link_help) = _card_fields(product)
+        
+        # Create two columns for layout (details only when the gallery has the images)
+        if show_image:
+            col1, col2 = st.columns([1, 2])
+            
+            with col1:
+                # Display product image
+                if image_url:
+                    try:
+                        st.image(image_url, width=200, caption=title)
+                    except (StreamlitAPIException, TypeError, ValueError):
+                        st.markdown("🖼️ *Image not available*")
+                else:
+                    st.markdown("🖼️ *No image available*")
+        else:
+            col2 = st.container()
+        
+        with col2:
+            # Product details, sent to the browser as a single element
+            st.markdown(
+                f"**💰 Price:** {price}\n\n"
+                f"**⭐ Rating:** {rating}\n\n"
+                f"**📝 Description:** {description}"
+            )
+            st.link_button(link_label, link_url, help=link_help)
+    
+    except (AttributeError, KeyError, TypeError, ValueError) as e:
+        st.error(f"Error displaying product: {e}")
+        st.write("**Product data:**", product)